@@ -0,0 +1,186 @@
+import os
+import queue
+import threading
+import time
+import uuid
+import zipfile
+from document_processor import extract_text_from_file, embed_document, store_embedded_document
+
+# Max documents waiting between two stages
+PIPELINE_QUEUE_SIZE = 4
+
+# File types the extraction stage understands
+SUPPORTED_EXTENSIONS = {".pdf", ".txt", ".docx"}
+
+# Limits on what a single ZIP archive may expand to
+MAX_ZIP_MEMBERS = 500
+MAX_ZIP_UNCOMPRESSED_BYTES = 500 * 1024 * 1024
+
+# Marks the end of the job stream on a queue
+_DONE = object()
+
+
+def expand_zip_archive(zip_path: str, dest_dir: str) -> list[dict]:
+    """
+    Extract supported files from a ZIP archive into dest_dir
+
+    Member paths are flattened to their base name so entries cannot escape
+    dest_dir. Folders, hidden files and unsupported types are skipped.
+    Archives with more than MAX_ZIP_MEMBERS supported files, or that expand
+    past MAX_ZIP_UNCOMPRESSED_BYTES, are rejected and nothing is kept.
+
+    Args:
+        zip_path: Path of the uploaded archive
+        dest_dir: Directory to write extracted files to
+
+    Returns:
+        Jobs with document_id, file_path and filename for each extracted file
+    """
+    jobs = []
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            members = []
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                filename = os.path.basename(member.filename)
+                if not filename or filename.startswith(".") or member.filename.startswith("__MACOSX/"):
+                    continue
+                if os.path.splitext(filename)[1].lower() not in SUPPORTED_EXTENSIONS:
+                    continue
+                members.append((member, filename))
+
+            if len(members) > MAX_ZIP_MEMBERS:
+                raise ValueError(f"ZIP archive has more than {MAX_ZIP_MEMBERS} files")
+            if sum(member.file_size for member, _ in members) > MAX_ZIP_UNCOMPRESSED_BYTES:
+                raise ValueError("ZIP archive is too large when uncompressed")
+
+            # Declared sizes can lie, so also count the bytes actually written
+            written = 0
+            for member, filename in members:
+                doc_id = str(uuid.uuid4())
+                file_path = os.path.join(dest_dir, f"{doc_id}_{filename}")
+                jobs.append({"document_id": doc_id, "file_path": file_path, "filename": filename})
+                with archive.open(member) as src, open(file_path, "wb") as dst:
+                    while True:
+                        block = src.read(1024 * 1024)
+                        if not block:
+                            break
+                        written += len(block)
+                        if written > MAX_ZIP_UNCOMPRESSED_BYTES:
+                            raise ValueError("ZIP archive is too large when uncompressed")
+                        dst.write(block)
+    except zipfile.BadZipFile as e:
+        _remove_job_files(jobs)
+        raise ValueError(f"Invalid ZIP archive: {str(e)}")
+    except Exception:
+        _remove_job_files(jobs)
+        raise
+    return jobs
+
+
+def _remove_job_files(jobs: list[dict]):
+    for job in jobs:
+        if os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+
+
+def _run_stage(work, in_queue: queue.Queue, out_queue: queue.Queue, results: dict):
+    """
+    Pull jobs from in_queue, apply work, push them to out_queue
+
+    Failed jobs are recorded in results and dropped from the pipeline.
+    """
+    while True:
+        job = in_queue.get()
+        if job is _DONE:
+            out_queue.put(_DONE)
+            return
+        try:
+            work(job)
+            out_queue.put(job)
+        except Exception as e:
+            results[job["document_id"]].update({"status": "error", "error": str(e)})
+
+
+def _extract(job: dict):
+    text = extract_text_from_file(job["file_path"], job["filename"])
+    if not text:
+        raise Exception("Could not extract text from file")
+    job["text"] = text
+
+
+def _embed(job: dict):
+    job["embedded"] = embed_document(job.pop("text"), job["filename"])
+
+
+def _store(job: dict):
+    job["num_chunks"] = store_embedded_document(job["document_id"], job.pop("embedded"), job["filename"])
+
+
+def ingest_documents(jobs: list[dict], queue_size: int = PIPELINE_QUEUE_SIZE) -> dict:
+    """
+    Run extract -> chunk/embed -> store as a pipeline across documents
+
+    Each stage runs in its own thread and stages are connected by bounded
+    queues, so extracting file N+1 overlaps embedding file N while memory
+    stays capped at a few documents in flight.
+
+    Args:
+        jobs: Dicts with document_id, file_path and filename
+        queue_size: Max documents buffered between stages
+
+    Returns:
+        Dict with per-file results and aggregate throughput
+    """
+    results = {
+        job["document_id"]: {
+            "document_id": job["document_id"],
+            "filename": job["filename"],
+            "status": "pending",
+            "num_chunks": 0,
+            "error": None
+        }
+        for job in jobs
+    }
+
+    extract_queue = queue.Queue(maxsize=queue_size)
+    embed_queue = queue.Queue(maxsize=queue_size)
+    store_queue = queue.Queue(maxsize=queue_size)
+    done_queue = queue.Queue()
+
+    stages = [
+        threading.Thread(target=_run_stage, args=(_extract, extract_queue, embed_queue, results), daemon=True),
+        threading.Thread(target=_run_stage, args=(_embed, embed_queue, store_queue, results), daemon=True),
+        threading.Thread(target=_run_stage, args=(_store, store_queue, done_queue, results), daemon=True),
+    ]
+
+    start = time.perf_counter()
+    for stage in stages:
+        stage.start()
+
+    for job in jobs:
+        extract_queue.put(dict(job))
+    extract_queue.put(_DONE)
+
+    while True:
+        job = done_queue.get()
+        if job is _DONE:
+            break
+        results[job["document_id"]].update({"status": "success", "num_chunks": job["num_chunks"]})
+
+    for stage in stages:
+        stage.join()
+    elapsed = time.perf_counter() - start
+
+    file_results = [results[job["document_id"]] for job in jobs]
+    num_succeeded = sum(1 for r in file_results if r["status"] == "success")
+
+    return {
+        "results": file_results,
+        "num_files": len(file_results),
+        "num_succeeded": num_succeeded,
+        "num_failed": len(file_results) - num_succeeded,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_minute": round(num_succeeded / elapsed * 60, 2) if elapsed > 0 else 0.0
+    }
@@ -0,0 +1,115 @@
+"""
+Benchmark backend cold start
+
+Reports:
+  - wall time of `import main` in a fresh interpreter
+  - the slowest imports by cumulative time (from python -X importtime)
+  - time from launching uvicorn to the first successful request on
+    /health/live and on /health/ready
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --top 15 --port 8765 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import_time(runs: int) -> list[float]:
+    """Wall time in ms of importing main in a fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c",
+             "import time; s = time.perf_counter(); import main; print((time.perf_counter() - s) * 1000)"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        timings.append(float(proc.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def import_time_breakdown(top: int) -> list[tuple[int, int, str]]:
+    """Top imports by cumulative time, as (cumulative_us, self_us, module)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    # Only top-level imports of main and its direct dependencies are interesting
+    rows = [row for row in rows if len(row[2]) - len(row[2].lstrip()) <= 3]
+    return sorted(rows, reverse=True)[:top]
+
+
+def wait_for(url: str, deadline: float) -> Optional[float]:
+    """Poll url until it returns 200, returning the time it first did"""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def time_to_first_request(port: int, timeout: float) -> dict:
+    """Launch uvicorn and time the first successful liveness and readiness checks"""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f"http://127.0.0.1:{port}/health/live", deadline)
+        ready = wait_for(f"http://127.0.0.1:{port}/health/ready", deadline)
+        return {
+            "live_ms": (live - start) * 1000 if live else None,
+            "ready_ms": (ready - start) * 1000 if ready else None,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Import timing repetitions")
+    parser.add_argument("--top", type=int, default=10, help="Number of imports to show in the breakdown")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server")
+    args = parser.parse_args()
+
+    timings = measure_import_time(args.runs)
+    print(f"import main: median {statistics.median(timings):.1f} ms, "
+          f"min {min(timings):.1f} ms, max {max(timings):.1f} ms ({args.runs} runs)")
+
+    print("\nSlowest imports (cumulative):")
+    print(f"{'cumulative_ms':>14} {'self_ms':>8}  module")
+    for cumulative_us, self_us, module in import_time_breakdown(args.top):
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}")
+
+    result = time_to_first_request(args.port, args.timeout)
+    print("\nTime to first successful request:")
+    for name, key in [("/health/live", "live_ms"), ("/health/ready", "ready_ms")]:
+        value = result[key]
+        print(f"  {name:<14} {f'{value:.1f} ms' if value is not None else 'timed out'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark the mmap vector backend against ChromaDB
+
+Uses random embeddings so Ollama is not needed. Each backend runs in its
+own subprocess so the reported peak RSS is not shared between them.
+
+Usage:
+    python bench_vector_store.py
+    python bench_vector_store.py --docs 20 --chunks 300 --queries 200
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+EMBEDDING_DIM = 768  # nomic-embed-text
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_backend(backend: str, docs: int, chunks: int, queries: int, n_results: int) -> dict:
+    """Load documents into one backend and time queries against it"""
+    rng = np.random.default_rng(0)
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+
+    if backend == "chroma":
+        import chromadb
+        client = chromadb.PersistentClient(path=work_dir)
+    else:
+        from vector_store import MmapVectorStore
+        store = MmapVectorStore(root_dir=work_dir, quantize=(backend == "mmap-int8"))
+
+    try:
+        start = time.perf_counter()
+        for d in range(docs):
+            embeddings = rng.standard_normal((chunks, EMBEDDING_DIM)).astype(np.float32).tolist()
+            texts = [f"chunk {i} of document {d}" for i in range(chunks)]
+            metadatas = [{"chunk_id": i, "filename": f"doc_{d}.pdf"} for i in range(chunks)]
+            if backend == "chroma":
+                collection = client.get_or_create_collection(name=f"doc_{d}")
+                collection.add(
+                    ids=[f"chunk_{i}" for i in range(chunks)],
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=metadatas
+                )
+            else:
+                store.add(str(d), embeddings=embeddings, documents=texts, metadatas=metadatas)
+        ingest_seconds = time.perf_counter() - start
+
+        latencies = []
+        for q in range(queries):
+            doc = q % docs
+            query = rng.standard_normal((1, EMBEDDING_DIM)).astype(np.float32).tolist()
+            start = time.perf_counter()
+            if backend == "chroma":
+                client.get_collection(name=f"doc_{doc}").query(query_embeddings=query, n_results=n_results)
+            else:
+                store.query(str(doc), query_embeddings=query, n_results=n_results)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        disk_bytes = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, files in os.walk(work_dir)
+            for name in files
+        )
+
+        return {
+            "backend": backend,
+            "ingest_s": round(ingest_seconds, 3),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "disk_mb": round(disk_bytes / (1024 * 1024), 2),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["chroma", "mmap", "mmap-int8"], help="Run a single backend (used internally)")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.backend:
+        result = run_backend(args.backend, args.docs, args.chunks, args.queries, args.n_results)
+        print(json.dumps(result))
+        return
+
+    print(f"{'backend':<10} {'ingest_s':>9} {'p50_ms':>8} {'p95_ms':>8} {'peak_rss_mb':>12} {'disk_mb':>8}")
+    for backend in ["chroma", "mmap", "mmap-int8"]:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--backend", backend,
+             "--docs", str(args.docs), "--chunks", str(args.chunks),
+             "--queries", str(args.queries), "--n-results", str(args.n_results)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<10} failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr else 'unknown error'}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:<10} {r['ingest_s']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['peak_rss_mb']:>12} {r['disk_mb']:>8}")
+
+
+if __name__ == "__main__":
+    main()
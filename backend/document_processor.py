@@ -1,14 +1,51 @@
 import os
-from PyPDF2 import PdfReader
-from docx import Document
-import chromadb
-import ollama
+import threading
 
-# Initialize ChromaDB client (persistent storage)
+# Heavy dependencies (chromadb, ollama, PyPDF2, docx, and vector_store for the
+# mmap backend) are imported on first use so that importing this module stays
+# cheap at worker startup.
+
+# Vector backend: "chroma" (default) or "mmap" (local memory-mapped arrays)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+VECTOR_QUANTIZE = os.getenv("VECTOR_QUANTIZE", "false").lower() == "true"
+
+# ChromaDB persistent storage
 CHROMA_DB_DIR = "chromadb_storage"
-os.makedirs(CHROMA_DB_DIR, exist_ok=True)
 
-chroma_client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
+_chroma_client = None
+_mmap_store = None
+_backend_lock = threading.Lock()
+
+
+def get_chroma_client():
+    """Return the ChromaDB client, creating it on first use"""
+    global _chroma_client
+    if _chroma_client is None:
+        with _backend_lock:
+            if _chroma_client is None:
+                import chromadb
+                os.makedirs(CHROMA_DB_DIR, exist_ok=True)
+                _chroma_client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
+    return _chroma_client
+
+
+def get_mmap_store():
+    """Return the memory-mapped vector store, creating it on first use"""
+    global _mmap_store
+    if _mmap_store is None:
+        with _backend_lock:
+            if _mmap_store is None:
+                from vector_store import MmapVectorStore
+                _mmap_store = MmapVectorStore(quantize=VECTOR_QUANTIZE)
+    return _mmap_store
+
+
+def init_vector_backend():
+    """Initialize the configured vector backend (used to warm up on readiness)"""
+    if VECTOR_BACKEND == "mmap":
+        get_mmap_store()
+    else:
+        get_chroma_client()
 
 # ============= TEXT EXTRACTION FUNCTIONS =============
 
@@ -34,6 +71,7 @@ def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from PDF file"""
     text = ""
     try:
+        from PyPDF2 import PdfReader
         reader = PdfReader(file_path)
         for page in reader.pages:
             text += page.extract_text() + "\n"
@@ -52,6 +90,7 @@ def extract_text_from_txt(file_path: str) -> str:
 def extract_text_from_docx(file_path: str) -> str:
     """Extract text from DOCX file"""
     try:
+        from docx import Document
         doc = Document(file_path)
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
         return text.strip()
@@ -108,6 +147,8 @@ def get_ollama_embeddings(texts: list[str]) -> list[list[float]]:
     Returns:
         List of embedding vectors
     """
+    import ollama
+    
     embeddings = []
     
     for text in texts:
@@ -123,9 +164,88 @@ def get_ollama_embeddings(texts: list[str]) -> list[list[float]]:
     return embeddings
 
 
+def embed_document(text: str, filename: str) -> dict:
+    """
+    Chunk document and generate embeddings for each chunk
+    
+    Args:
+        text: Full document text
+        filename: Original filename
+    
+    Returns:
+        Dict with chunk ids, texts, metadatas and embeddings
+    """
+    # Chunk the text
+    chunks = chunk_text(text)
+    
+    if not chunks:
+        raise Exception("No chunks created from document")
+    
+    # Prepare data for the vector store
+    chunk_texts = [chunk["text"] for chunk in chunks]
+    chunk_ids = [f"chunk_{chunk['chunk_id']}" for chunk in chunks]
+    metadatas = [
+        {
+            "chunk_id": chunk["chunk_id"],
+            "start_char": chunk["start_char"],
+            "end_char": chunk["end_char"],
+            "filename": filename
+        }
+        for chunk in chunks
+    ]
+    
+    # Generate embeddings using Ollama
+    embeddings = get_ollama_embeddings(chunk_texts)
+    
+    return {
+        "ids": chunk_ids,
+        "documents": chunk_texts,
+        "metadatas": metadatas,
+        "embeddings": embeddings
+    }
+
+
+def store_embedded_document(document_id: str, embedded: dict, filename: str) -> int:
+    """
+    Store an already embedded document in the configured vector backend
+    
+    Args:
+        document_id: Unique document identifier
+        embedded: Output of embed_document
+        filename: Original filename
+    
+    Returns:
+        Number of chunks stored
+    """
+    if VECTOR_BACKEND == "mmap":
+        get_mmap_store().add(
+            document_id,
+            embeddings=embedded["embeddings"],
+            documents=embedded["documents"],
+            metadatas=embedded["metadatas"]
+        )
+        return len(embedded["ids"])
+    
+    # Create or get collection for this document
+    collection = get_chroma_client().get_or_create_collection(
+        name=f"doc_{document_id}",
+        metadata={"filename": filename}
+    )
+    
+    # Store in ChromaDB
+    collection.add(
+        ids=embedded["ids"],
+        embeddings=embedded["embeddings"],
+        documents=embedded["documents"],
+        metadatas=embedded["metadatas"]
+    )
+    
+    return len(embedded["ids"])
+
+
 def store_document_in_chromadb(document_id: str, text: str, filename: str) -> int:
     """
-    Chunk document, generate embeddings, and store in ChromaDB
+    Chunk document, generate embeddings, and store in the configured vector backend
     
     Args:
         document_id: Unique document identifier
@@ -136,51 +256,16 @@ def store_document_in_chromadb(document_id: str, text: str, filename: str) -> in
         Number of chunks stored
     """
     try:
-        # Create or get collection for this document
-        collection = chroma_client.get_or_create_collection(
-            name=f"doc_{document_id}",
-            metadata={"filename": filename}
-        )
-        
-        # Chunk the text
-        chunks = chunk_text(text)
-        
-        if not chunks:
-            raise Exception("No chunks created from document")
-        
-        # Prepare data for ChromaDB
-        chunk_texts = [chunk["text"] for chunk in chunks]
-        chunk_ids = [f"chunk_{chunk['chunk_id']}" for chunk in chunks]
-        metadatas = [
-            {
-                "chunk_id": chunk["chunk_id"],
-                "start_char": chunk["start_char"],
-                "end_char": chunk["end_char"],
-                "filename": filename
-            }
-            for chunk in chunks
-        ]
-        
-        # Generate embeddings using Ollama
-        embeddings = get_ollama_embeddings(chunk_texts)
-        
-        # Store in ChromaDB
-        collection.add(
-            ids=chunk_ids,
-            embeddings=embeddings,
-            documents=chunk_texts,
-            metadatas=metadatas
-        )
-        
-        return len(chunks)
+        embedded = embed_document(text, filename)
+        return store_embedded_document(document_id, embedded, filename)
     
     except Exception as e:
-        raise Exception(f"Error storing document in ChromaDB: {str(e)}")
+        raise Exception(f"Error storing document in vector store: {str(e)}")
 
 
 def query_document(document_id: str, question: str, n_results: int = 3) -> list[dict]:
     """
-    Query ChromaDB for relevant chunks from a specific document
+    Query the vector backend for relevant chunks from a specific document
     
     Args:
         document_id: Document to search in
@@ -191,17 +276,24 @@ def query_document(document_id: str, question: str, n_results: int = 3) -> list[
         List of relevant chunks with metadata
     """
     try:
-        # Get the document's collection
-        collection = chroma_client.get_collection(name=f"doc_{document_id}")
-        
         # Generate embedding for the question
         question_embedding = get_ollama_embeddings([question])[0]
         
-        # Query ChromaDB
-        results = collection.query(
-            query_embeddings=[question_embedding],
-            n_results=n_results
-        )
+        if VECTOR_BACKEND == "mmap":
+            results = get_mmap_store().query(
+                document_id,
+                query_embeddings=[question_embedding],
+                n_results=n_results
+            )
+        else:
+            # Get the document's collection
+            collection = get_chroma_client().get_collection(name=f"doc_{document_id}")
+            
+            # Query ChromaDB
+            results = collection.query(
+                query_embeddings=[question_embedding],
+                n_results=n_results
+            )
         
         # Format results
         relevant_chunks = []
@@ -220,13 +312,17 @@ def query_document(document_id: str, question: str, n_results: int = 3) -> list[
 
 def delete_document_from_chromadb(document_id: str):
     """
-    Delete a document's collection from ChromaDB
+    Delete a document from the configured vector backend
     
     Args:
         document_id: Document to delete
     """
+    if VECTOR_BACKEND == "mmap":
+        get_mmap_store().delete(document_id)
+        return
+    
     try:
-        chroma_client.delete_collection(name=f"doc_{document_id}")
+        get_chroma_client().delete_collection(name=f"doc_{document_id}")
     except Exception as e:
         # Collection might not exist, that's okay
         pass
\ No newline at end of file
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable
+
+# Max Ollama generations running at once across all chat endpoints
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", "4"))
+
+# Seconds between client disconnect checks while a generation is running
+DISCONNECT_POLL_INTERVAL = 0.25
+
+_generation_slots = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+_client = None
+
+
+def get_client():
+    """Return the shared Ollama async client, creating it on first use"""
+    global _client
+    if _client is None:
+        import ollama
+        _client = ollama.AsyncClient()
+    return _client
+
+
+async def close_client():
+    """Close the shared Ollama client and its connection pool"""
+    global _client
+    if _client is not None:
+        await _client._client.aclose()
+        _client = None
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is aborted because the client went away"""
+
+
+class GenerationMetrics:
+    """
+    Counters for completed and cancelled generations
+
+    Tokens saved by a cancellation are estimated as the average length of
+    completed responses minus the tokens already generated when it stopped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed_generations = 0
+        self.completed_tokens = 0
+        self.cancelled_generations = 0
+        self.tokens_generated_before_cancel = 0
+        self.tokens_saved_estimate = 0
+
+    def record_completed(self, tokens: int):
+        with self._lock:
+            self.completed_generations += 1
+            self.completed_tokens += tokens
+
+    def record_cancelled(self, tokens_generated: int):
+        with self._lock:
+            self.cancelled_generations += 1
+            self.tokens_generated_before_cancel += tokens_generated
+            if self.completed_generations:
+                expected = self.completed_tokens / self.completed_generations
+                self.tokens_saved_estimate += max(0, round(expected) - tokens_generated)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "completed_generations": self.completed_generations,
+                "completed_tokens": self.completed_tokens,
+                "cancelled_generations": self.cancelled_generations,
+                "tokens_generated_before_cancel": self.tokens_generated_before_cancel,
+                "tokens_saved_estimate": self.tokens_saved_estimate,
+                "max_concurrent_generations": MAX_CONCURRENT_GENERATIONS,
+            }
+
+
+metrics = GenerationMetrics()
+
+
+async def _stream_chat(model: str, messages: list, progress: dict) -> AsyncIterator[str]:
+    """
+    Stream content from Ollama, tracking tokens generated in progress
+
+    Closing or cancelling this generator closes the HTTP connection to
+    Ollama, which stops the model from generating further tokens.
+    """
+    stream = await get_client().chat(model=model, messages=messages, stream=True)
+    try:
+        async for chunk in stream:
+            if chunk.get("done"):
+                progress["tokens"] = chunk.get("eval_count", progress["tokens"])
+            content = chunk.get("message", {}).get("content")
+            if content:
+                progress["tokens"] += 1
+                yield content
+    finally:
+        await stream.aclose()
+
+
+async def _acquire_slot(is_disconnected: Callable[[], Awaitable[bool]]):
+    """
+    Wait for a generation slot, giving up if the client disconnects first
+
+    Raises:
+        GenerationCancelled: If the client disconnected while queued
+    """
+    acquire = asyncio.ensure_future(_generation_slots.acquire())
+    try:
+        while True:
+            done, _ = await asyncio.wait({acquire}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return
+            if await is_disconnected():
+                metrics.record_cancelled(0)
+                raise GenerationCancelled()
+    except (GenerationCancelled, asyncio.CancelledError):
+        if acquire.done() and not acquire.cancelled():
+            _generation_slots.release()
+        else:
+            acquire.cancel()
+        raise
+
+
+async def generate_chat(model: str, messages: list,
+                        is_disconnected: Callable[[], Awaitable[bool]]) -> str:
+    """
+    Run a chat generation, aborting it if the client disconnects
+
+    Args:
+        model: Ollama model to use
+        messages: Chat messages to send
+        is_disconnected: Coroutine function reporting client disconnects,
+            usually Request.is_disconnected
+
+    Returns:
+        Generated response text
+
+    Raises:
+        GenerationCancelled: If the client disconnected before completion
+    """
+    progress = {"tokens": 0}
+
+    async def collect() -> str:
+        parts = []
+        async for content in _stream_chat(model, messages, progress):
+            parts.append(content)
+        return "".join(parts)
+
+    await _acquire_slot(is_disconnected)
+    try:
+        task = asyncio.create_task(collect())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+                if done:
+                    break
+                if await is_disconnected():
+                    raise GenerationCancelled()
+        except (GenerationCancelled, asyncio.CancelledError):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            metrics.record_cancelled(progress["tokens"])
+            raise
+
+        response = task.result()
+        metrics.record_completed(progress["tokens"])
+        return response
+    finally:
+        _generation_slots.release()
+
+
+async def stream_chat(model: str, messages: list) -> AsyncIterator[str]:
+    """
+    Stream a chat generation, aborting it if the consumer stops early
+
+    StreamingResponse cancels or closes this generator when the client
+    disconnects, which closes the upstream Ollama request and frees the slot.
+    """
+    progress = {"tokens": 0}
+
+    async with _generation_slots:
+        stream = _stream_chat(model, messages, progress)
+        try:
+            async for content in stream:
+                yield content
+        except (asyncio.CancelledError, GeneratorExit):
+            metrics.record_cancelled(progress["tokens"])
+            raise
+        finally:
+            await stream.aclose()
+        metrics.record_completed(progress["tokens"])
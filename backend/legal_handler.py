@@ -1,5 +1,5 @@
-import ollama
-from typing import Generator
+from typing import AsyncIterator
+from generation import generate_chat, stream_chat, GenerationCancelled
 
 class LegalHandler:
     def __init__(self, model_name: str = "llama2"):
@@ -16,65 +16,40 @@ Important guidelines:
 
 Always include a disclaimer in your responses when appropriate."""
 
-    def chat(self, message: str) -> str:
-        """Send a message and get a response"""
+    def _build_messages(self, messages: list) -> list:
+        """Prepend the system prompt to the conversation messages"""
+        return [
+            {
+                'role': 'system',
+                'content': self.system_prompt
+            }
+        ] + messages
+
+    async def chat(self, message: str, is_disconnected) -> str:
+        """Send a message and get a response, aborting if the client disconnects"""
         try:
-            response = ollama.chat(
-                model=self.model_name,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': self.system_prompt
-                    },
-                    {
-                        'role': 'user',
-                        'content': message
-                    }
-                ]
+            return await generate_chat(
+                self.model_name,
+                self._build_messages([{'role': 'user', 'content': message}]),
+                is_disconnected
             )
-            return response['message']['content']
+        except GenerationCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Error in legal chat: {str(e)}")
 
-    def chat_stream(self, message: str) -> Generator[str, None, None]:
-        """Stream chat responses"""
-        try:
-            stream = ollama.chat(
-                model=self.model_name,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': self.system_prompt
-                    },
-                    {
-                        'role': 'user',
-                        'content': message
-                    }
-                ],
-                stream=True
-            )
-            
-            for chunk in stream:
-                if 'message' in chunk and 'content' in chunk['message']:
-                    yield chunk['message']['content']
-        except Exception as e:
-            raise Exception(f"Error in legal chat stream: {str(e)}")
+    def chat_stream(self, message: str) -> AsyncIterator[str]:
+        """Stream chat responses, aborting generation if the consumer stops early"""
+        return stream_chat(
+            self.model_name,
+            self._build_messages([{'role': 'user', 'content': message}])
+        )
 
-    def chat_with_history(self, messages: list) -> str:
-        """Chat with conversation history"""
+    async def chat_with_history(self, messages: list, is_disconnected) -> str:
+        """Chat with conversation history, aborting if the client disconnects"""
         try:
-            # Add system prompt at the beginning
-            full_messages = [
-                {
-                    'role': 'system',
-                    'content': self.system_prompt
-                }
-            ] + messages
-            
-            response = ollama.chat(
-                model=self.model_name,
-                messages=full_messages
-            )
-            return response['message']['content']
+            return await generate_chat(self.model_name, self._build_messages(messages), is_disconnected)
+        except GenerationCancelled:
+            raise
         except Exception as e:
-            raise Exception(f"Error in legal chat with history: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error in legal chat with history: {str(e)}")
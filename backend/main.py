@@ -1,10 +1,15 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
 import os
 import uuid
-from document_processor import extract_text_from_file, store_document_in_chromadb, delete_document_from_chromadb
+from document_processor import extract_text_from_file, store_document_in_chromadb, delete_document_from_chromadb, init_vector_backend
 from ollama_handler import chat_with_document
+from generation import GenerationCancelled, close_client, metrics as generation_metrics
+from batch_ingest import ingest_documents, expand_zip_archive
 from legal_handler import LegalHandler
 from auth import (
     UserSignUp, UserSignIn, sign_up_user, sign_in_user, 
@@ -29,8 +34,37 @@ documents = {}
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Initialize legal handler
-legal_handler = LegalHandler(model_name="llama3.2")
+# Legal handler is created on first use
+_legal_handler = None
+
+def get_legal_handler() -> LegalHandler:
+    """Return the shared LegalHandler, creating it on first use"""
+    global _legal_handler
+    if _legal_handler is None:
+        _legal_handler = LegalHandler(model_name="llama3.2")
+    return _legal_handler
+
+# Seconds the readiness probe waits for Ollama before reporting not ready
+READINESS_TIMEOUT = 2.0
+
+_readiness_client = None
+
+def get_readiness_client():
+    """Return the Ollama client used by the readiness probe, creating it on first use"""
+    global _readiness_client
+    if _readiness_client is None:
+        import ollama
+        _readiness_client = ollama.AsyncClient(timeout=READINESS_TIMEOUT)
+    return _readiness_client
+
+@app.on_event("shutdown")
+async def close_ollama_clients():
+    """Close shared Ollama client connection pools"""
+    global _readiness_client
+    await close_client()
+    if _readiness_client is not None:
+        await _readiness_client._client.aclose()
+        _readiness_client = None
 
 class ChatRequest(BaseModel):
     document_id: str
@@ -66,6 +100,34 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 async def root():
     return {"message": "DocChat API is running"}
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: vector backend is initialized and Ollama is reachable"""
+    checks = {}
+    try:
+        await run_in_threadpool(init_vector_backend)
+        checks["vector_backend"] = "ok"
+    except Exception as e:
+        checks["vector_backend"] = f"error: {str(e)}"
+    
+    try:
+        await asyncio.wait_for(get_readiness_client().list(), timeout=READINESS_TIMEOUT)
+        checks["ollama"] = "ok"
+    except asyncio.TimeoutError:
+        checks["ollama"] = "error: timed out"
+    except Exception as e:
+        checks["ollama"] = f"error: {str(e)}"
+    
+    if any(value != "ok" for value in checks.values()):
+        raise HTTPException(status_code=503, detail={"status": "not ready", "checks": checks})
+    
+    return {"status": "ready", "checks": checks}
+
 @app.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
@@ -109,9 +171,77 @@ async def upload_document(
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
 
 
+@app.post("/upload/batch")
+async def upload_documents_batch(
+    files: list[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Upload several files and/or ZIP archives and ingest them as a pipeline"""
+    jobs = []
+    saved_paths = []
+    saved_all = False
+    try:
+        for file in files:
+            # Drop any directory part so a crafted name cannot escape UPLOAD_DIR
+            filename = os.path.basename(file.filename or "")
+            if not filename:
+                raise ValueError("Uploaded file has no name")
+            
+            doc_id = str(uuid.uuid4())
+            file_path = os.path.join(UPLOAD_DIR, f"{doc_id}_{filename}")
+            
+            # Save file
+            with open(file_path, "wb") as f:
+                content = await file.read()
+                f.write(content)
+            saved_paths.append(file_path)
+            
+            if filename.lower().endswith(".zip"):
+                try:
+                    extracted = await run_in_threadpool(expand_zip_archive, file_path, UPLOAD_DIR)
+                finally:
+                    os.remove(file_path)
+                    saved_paths.remove(file_path)
+                jobs.extend(extracted)
+                saved_paths.extend(job["file_path"] for job in extracted)
+            else:
+                jobs.append({"document_id": doc_id, "file_path": file_path, "filename": filename})
+        saved_all = True
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading files: {str(e)}")
+    finally:
+        # Don't leave earlier files of a rejected request behind in UPLOAD_DIR
+        if not saved_all:
+            for path in saved_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No supported files found in upload")
+    
+    summary = await run_in_threadpool(ingest_documents, jobs)
+    
+    # Store metadata for every document that made it through the pipeline
+    paths = {job["document_id"]: job["file_path"] for job in jobs}
+    for result in summary["results"]:
+        if result["status"] == "success":
+            documents[result["document_id"]] = {
+                "id": result["document_id"],
+                "filename": result["filename"],
+                "file_path": paths[result["document_id"]],
+                "user_email": current_user["email"],
+                "num_chunks": result["num_chunks"]
+            }
+    
+    return summary
+
+
 @app.post("/chat")
 async def chat(
     request: ChatRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     try:
@@ -125,10 +255,11 @@ async def chat(
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Use RAG: pass document_id instead of full text
-        response = chat_with_document(
+        response = await chat_with_document(
             document_id=request.document_id,
             question=request.question,
-            model=request.model
+            model=request.model,
+            is_disconnected=http_request.is_disconnected
         )
         
         return {
@@ -136,44 +267,66 @@ async def chat(
             "document_id": request.document_id
         }
     
+    except GenerationCancelled:
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
 @app.post("/api/legal/chat")
 async def legal_chat(
     request: LegalChatRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     try:
         if not request.message:
             raise HTTPException(status_code=400, detail="Message is required")
         
-        response = legal_handler.chat(request.message)
+        response = await get_legal_handler().chat(request.message, http_request.is_disconnected)
         
         return {
             "status": "success",
             "response": response,
             "disclaimer": "This is general legal information, not legal advice. Please consult with a licensed attorney for specific legal matters."
         }
+    except GenerationCancelled:
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/legal/chat/stream")
+async def legal_chat_stream(
+    request: LegalChatRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream a legal chat response; generation stops if the client disconnects"""
+    if not request.message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    return StreamingResponse(
+        get_legal_handler().chat_stream(request.message),
+        media_type="text/plain"
+    )
+
 @app.post("/api/legal/chat-history")
 async def legal_chat_with_history(
     request: LegalChatHistoryRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     try:
         if not request.messages:
             raise HTTPException(status_code=400, detail="Messages are required")
         
-        response = legal_handler.chat_with_history(request.messages)
+        response = await get_legal_handler().chat_with_history(request.messages, http_request.is_disconnected)
         
         return {
             "status": "success",
             "response": response,
             "disclaimer": "This is general legal information, not legal advice. Please consult with a licensed attorney for specific legal matters."
         }
+    except GenerationCancelled:
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -197,6 +350,11 @@ async def get_document(
         "num_chunks": doc.get("num_chunks", 0)
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Generation counters, including cancelled generations and tokens saved"""
+    return generation_metrics.snapshot()
+
 @app.get("/models")
 async def list_models():
     try:
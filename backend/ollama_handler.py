@@ -1,27 +1,54 @@
-import ollama
+from fastapi.concurrency import run_in_threadpool
 from document_processor import query_document
+from generation import generate_chat, GenerationCancelled
 
-def chat_with_document(document_id: str, question: str, model: str = "llama3.2") -> str:
+async def chat_with_document(document_id: str, question: str, model: str = "llama3.2",
+                             is_disconnected=None) -> str:
     """
-    Answer question using RAG - retrieve relevant chunks then generate answer
+    Answer question using RAG, aborting generation if the client disconnects
     
     Args:
         document_id: ID of the document to query
         question: User's question
         model: Ollama model to use for generation
+        is_disconnected: Coroutine function reporting client disconnects
     
     Returns:
         Generated answer
     """
     try:
-        # Step 1: Retrieve relevant chunks from ChromaDB
-        relevant_chunks = query_document(document_id, question, n_results=3)
-        
-        # Step 2: Combine chunks into context
-        context = "\n\n---\n\n".join([chunk["text"] for chunk in relevant_chunks])
-        
-        # Step 3: Create RAG prompt
-        prompt = f"""You are a helpful assistant that answers questions about documents.
+        messages = await run_in_threadpool(build_rag_messages, document_id, question)
+        return await generate_chat(model, messages, is_disconnected or _never_disconnected)
+    
+    except GenerationCancelled:
+        raise
+    except Exception as e:
+        raise Exception(f"Error communicating with Ollama: {str(e)}")
+
+
+async def _never_disconnected() -> bool:
+    return False
+
+
+def build_rag_messages(document_id: str, question: str) -> list:
+    """
+    Retrieve relevant chunks and build the chat messages for a RAG answer
+    
+    Args:
+        document_id: ID of the document to query
+        question: User's question
+    
+    Returns:
+        Messages to send to the model
+    """
+    # Step 1: Retrieve relevant chunks from ChromaDB
+    relevant_chunks = query_document(document_id, question, n_results=3)
+    
+    # Step 2: Combine chunks into context
+    context = "\n\n---\n\n".join([chunk["text"] for chunk in relevant_chunks])
+    
+    # Step 3: Create RAG prompt
+    prompt = f"""You are a helpful assistant that answers questions about documents.
 
 Based on the following relevant excerpts from the document, please answer the question.
 
@@ -32,25 +59,18 @@ Question: {question}
 
 Please provide a clear and concise answer based on the excerpts above. If the excerpts don't contain enough information to answer the question, say so."""
 
-        # Step 4: Call Ollama for generation
-        response = ollama.chat(
-            model=model,
-            messages=[
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ]
-        )
-        
-        return response['message']['content']
-    
-    except Exception as e:
-        raise Exception(f"Error communicating with Ollama: {str(e)}")
+    return [
+        {
+            'role': 'user',
+            'content': prompt
+        }
+    ]
 
 
 def get_available_models():
     """Get list of available Ollama models"""
+    import ollama
+    
     try:
         models = ollama.list()
         return [model['name'] for model in models['models']]
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import re
+import pytest
+import generation
+from generation import GenerationCancelled, generate_chat, stream_chat, metrics
+
+SLOW_TOKENS = 200
+QUICK_TOKENS = 50
+QUICK_RESPONSE = "".join(f"t{i} " for i in range(QUICK_TOKENS))
+
+
+class StubOllama:
+    """
+    Minimal Ollama /api/chat server streaming NDJSON over chunked HTTP
+
+    The "slow" model emits SLOW_TOKENS tokens 50ms apart, any other model
+    emits QUICK_TOKENS immediately. connection_reset is set when a client
+    drops the connection before the response is complete.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.requests = 0
+        self.connection_reset = asyncio.Event()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _write_chunk(self, writer, payload: dict):
+        data = (json.dumps(payload) + "\n").encode()
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    async def _handle(self, reader, writer):
+        headers = await reader.readuntil(b"\r\n\r\n")
+        length = int(re.search(rb"content-length:\s*(\d+)", headers, re.I).group(1))
+        body = json.loads(await reader.readexactly(length))
+        self.requests += 1
+
+        slow = body["model"] == "slow"
+        tokens, delay = (SLOW_TOKENS, 0.05) if slow else (QUICK_TOKENS, 0)
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        # The client never sends more data, so EOF here means it hung up
+        hangup = asyncio.ensure_future(reader.read(1))
+        try:
+            for i in range(tokens):
+                await asyncio.sleep(delay)
+                if hangup.done():
+                    self.connection_reset.set()
+                    return
+                self._write_chunk(writer, {"message": {"role": "assistant", "content": f"t{i} "}, "done": False})
+                await writer.drain()
+                self.sent += 1
+            self._write_chunk(writer, {"message": {"role": "assistant", "content": ""}, "done": True, "eval_count": tokens})
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            self.connection_reset.set()
+        finally:
+            hangup.cancel()
+            writer.close()
+
+
+@pytest.fixture
+def stub_env(monkeypatch):
+    """Fresh slot semaphore and client per test, pointed at a stub server"""
+    monkeypatch.setattr(generation, "_generation_slots", asyncio.Semaphore(generation.MAX_CONCURRENT_GENERATIONS))
+    monkeypatch.setattr(generation, "_client", None)
+
+    async def start():
+        stub = StubOllama()
+        monkeypatch.setenv("OLLAMA_HOST", await stub.start())
+        return stub
+
+    return start
+
+
+async def _never() -> bool:
+    return False
+
+
+def test_generate_chat_aborts_upstream_on_disconnect(stub_env):
+    async def run():
+        stub = await stub_env()
+        try:
+            # A completed generation gives the tokens-saved estimate a baseline
+            assert await generate_chat("quick", [], _never) == QUICK_RESPONSE
+            before = metrics.snapshot()
+
+            async def disconnected() -> bool:
+                return stub.sent >= 3
+
+            with pytest.raises(GenerationCancelled):
+                await generate_chat("slow", [], disconnected)
+
+            await asyncio.wait_for(stub.connection_reset.wait(), timeout=2)
+            after = metrics.snapshot()
+            assert stub.sent < SLOW_TOKENS
+            assert after["cancelled_generations"] == before["cancelled_generations"] + 1
+            assert after["tokens_saved_estimate"] > before["tokens_saved_estimate"]
+            assert generation._generation_slots._value == generation.MAX_CONCURRENT_GENERATIONS
+        finally:
+            await generation.close_client()
+            await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_stream_chat_aborts_upstream_when_consumer_stops(stub_env):
+    async def run():
+        stub = await stub_env()
+        try:
+            assert "".join([c async for c in stream_chat("quick", [])]) == QUICK_RESPONSE
+            before = metrics.snapshot()
+
+            stream = stream_chat("slow", [])
+            received = []
+            async for content in stream:
+                received.append(content)
+                if len(received) == 3:
+                    break
+            await stream.aclose()
+
+            await asyncio.wait_for(stub.connection_reset.wait(), timeout=2)
+            after = metrics.snapshot()
+            assert stub.sent < SLOW_TOKENS
+            assert after["cancelled_generations"] == before["cancelled_generations"] + 1
+            assert after["tokens_saved_estimate"] > before["tokens_saved_estimate"]
+            assert generation._generation_slots._value == generation.MAX_CONCURRENT_GENERATIONS
+        finally:
+            await generation.close_client()
+            await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_generate_chat_gives_up_while_waiting_for_slot(stub_env):
+    async def run():
+        stub = await stub_env()
+        try:
+            # Occupy every slot so the next request has to queue
+            for _ in range(generation.MAX_CONCURRENT_GENERATIONS):
+                await generation._generation_slots.acquire()
+            before = metrics.snapshot()
+
+            async def disconnected() -> bool:
+                return True
+
+            with pytest.raises(GenerationCancelled):
+                await asyncio.wait_for(generate_chat("slow", [], disconnected), timeout=2)
+
+            for _ in range(generation.MAX_CONCURRENT_GENERATIONS):
+                generation._generation_slots.release()
+
+            assert stub.requests == 0
+            assert metrics.snapshot()["cancelled_generations"] == before["cancelled_generations"] + 1
+            assert generation._generation_slots._value == generation.MAX_CONCURRENT_GENERATIONS
+        finally:
+            await generation.close_client()
+            await stub.stop()
+
+    asyncio.run(run())
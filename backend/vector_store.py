@@ -0,0 +1,158 @@
+import os
+import json
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Local vector storage (one directory per document)
+VECTOR_STORE_DIR = "vector_storage"
+
+# Rows scored per matrix multiply, keeps peak memory flat on large documents
+QUERY_BLOCK_SIZE = 4096
+
+# Documents whose opened arrays and chunks are kept in memory between queries
+DOCUMENT_CACHE_SIZE = 32
+
+
+class MmapVectorStore:
+    """
+    Exact-search vector store backed by memory-mapped NumPy arrays.
+
+    Each document gets its own directory holding a normalized embedding
+    matrix (float16, or int8 with per-row scales) plus a JSON file with the
+    chunk texts and metadata. Queries run a brute-force cosine top-k, which
+    for a few hundred chunks is faster and lighter than an HNSW index.
+    """
+
+    def __init__(self, root_dir: str = VECTOR_STORE_DIR, quantize: bool = False):
+        self.root_dir = root_dir
+        self.quantize = quantize
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _doc_dir(self, document_id: str) -> str:
+        return os.path.join(self.root_dir, f"doc_{document_id}")
+
+    def _evict(self, document_id: str):
+        with self._cache_lock:
+            self._cache.pop(document_id, None)
+
+    def _load(self, document_id: str) -> tuple:
+        """
+        Return (matrix, scales, chunks) for a document, opening it at most
+        once while it stays in the LRU cache
+        """
+        with self._cache_lock:
+            if document_id in self._cache:
+                self._cache.move_to_end(document_id)
+                return self._cache[document_id]
+
+        doc_dir = self._doc_dir(document_id)
+        if not os.path.isdir(doc_dir):
+            raise ValueError(f"Document {document_id} does not exist")
+
+        matrix = np.load(os.path.join(doc_dir, "embeddings.npy"), mmap_mode="r")
+        scales_path = os.path.join(doc_dir, "scales.npy")
+        scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        with open(os.path.join(doc_dir, "chunks.json"), "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+
+        entry = (matrix, scales, chunks)
+        with self._cache_lock:
+            self._cache[document_id] = entry
+            self._cache.move_to_end(document_id)
+            while len(self._cache) > DOCUMENT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return entry
+
+    def add(self, document_id: str, embeddings: list[list[float]],
+            documents: list[str], metadatas: list[dict]):
+        """
+        Write a document's embeddings and chunks to disk
+
+        Args:
+            document_id: Unique document identifier
+            embeddings: One embedding vector per chunk
+            documents: Chunk texts
+            metadatas: Chunk metadata dicts
+        """
+        if not (len(embeddings) == len(documents) == len(metadatas)):
+            raise ValueError("embeddings, documents and metadatas must have the same length")
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.maximum(norms, 1e-12)
+
+        doc_dir = self._doc_dir(document_id)
+        tmp_dir = doc_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        if self.quantize:
+            # Symmetric per-row int8 quantization
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales = np.maximum(scales, 1e-12).astype(np.float32)
+            quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+            np.save(os.path.join(tmp_dir, "embeddings.npy"), quantized)
+            np.save(os.path.join(tmp_dir, "scales.npy"), scales)
+        else:
+            np.save(os.path.join(tmp_dir, "embeddings.npy"), matrix.astype(np.float16))
+
+        with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump({"documents": documents, "metadatas": metadatas}, f)
+
+        # Swap the new files in so readers never see a half-written document
+        self._evict(document_id)
+        shutil.rmtree(doc_dir, ignore_errors=True)
+        os.replace(tmp_dir, doc_dir)
+        self._evict(document_id)
+
+    def query(self, document_id: str, query_embeddings: list[list[float]],
+              n_results: int = 3) -> dict:
+        """
+        Find the closest chunks for one or more query embeddings
+
+        Args:
+            document_id: Document to search in
+            query_embeddings: Batch of query vectors
+            n_results: Number of chunks to return per query
+
+        Returns:
+            Dict shaped like a ChromaDB query result, with cosine distances
+        """
+        matrix, scales, chunks = self._load(document_id)
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        num_rows = matrix.shape[0]
+        similarities = np.empty((queries.shape[0], num_rows), dtype=np.float32)
+        for start in range(0, num_rows, QUERY_BLOCK_SIZE):
+            end = min(start + QUERY_BLOCK_SIZE, num_rows)
+            block = np.asarray(matrix[start:end], dtype=np.float32)
+            block_scores = queries @ block.T
+            if scales is not None:
+                block_scores *= scales[start:end]
+            similarities[:, start:end] = block_scores
+
+        k = min(n_results, num_rows)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row in similarities:
+            if k < num_rows:
+                top = np.argpartition(-row, k - 1)[:k]
+            else:
+                top = np.arange(num_rows)
+            top = top[np.argsort(-row[top])]
+            results["ids"].append([f"chunk_{i}" for i in top])
+            results["documents"].append([chunks["documents"][i] for i in top])
+            results["metadatas"].append([chunks["metadatas"][i] for i in top])
+            results["distances"].append([float(1.0 - row[i]) for i in top])
+
+        return results
+
+    def delete(self, document_id: str):
+        """Remove a document's files"""
+        self._evict(document_id)
+        shutil.rmtree(self._doc_dir(document_id), ignore_errors=True)
@@ -73,6 +73,37 @@ export const uploadDocument = async (file) => {
   return data
 }
 
+export const uploadDocumentsBatch = async (files) => {
+  const token = getAuthToken()
+  const formData = new FormData()
+  for (const file of files) {
+    formData.append('files', file)
+  }
+
+  const response = await fetch(`${API_BASE_URL}/upload/batch`, {
+    method: 'POST',
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+    body: formData,
+  })
+
+  if (response.status === 401) {
+    localStorage.removeItem('token')
+    localStorage.removeItem('user')
+    window.location.href = '/signin'
+    throw new Error('Session expired. Please sign in again.')
+  }
+
+  const data = await response.json()
+
+  if (!response.ok) {
+    throw new Error(data.detail || 'Batch upload failed')
+  }
+
+  return data
+}
+
 export const chatWithDocument = async (documentId, question, model = 'llama3.2') => {
   return apiRequest('/chat', {
     method: 'POST',